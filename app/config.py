@@ -4,3 +4,25 @@ import os
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, "data", "accountability.db")
 DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# Cold-log archive (separate SQLite file, attached as schema "archive")
+ARCHIVE_DB_PATH = os.path.join(BASE_DIR, "data", "archive.db")
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+
+# Online backups (compressed snapshots, rotated)
+BACKUP_DIR = os.path.join(BASE_DIR, "data", "backups")
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))
+
+# Concurrency limit for expensive routes (analytics, full logs page)
+HEAVY_ROUTE_LIMIT = int(os.getenv("HEAVY_ROUTE_LIMIT", "4"))
+HEAVY_ROUTE_WAIT = float(os.getenv("HEAVY_ROUTE_WAIT", "0.5"))  # seconds to queue
+HEAVY_ROUTE_RETRY_AFTER = int(os.getenv("HEAVY_ROUTE_RETRY_AFTER", "2"))
+
+# Notes longer than this (bytes) are stored zlib-compressed
+NOTES_COMPRESS_THRESHOLD = int(os.getenv("NOTES_COMPRESS_THRESHOLD", "1024"))
+
+# Periodic digest reports (generated in a process pool, served as files)
+REPORTS_DIR = os.path.join(BASE_DIR, "data", "reports")
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_SCHEDULER = os.getenv("REPORT_SCHEDULER", "0") == "1"
+REPORT_CHECK_INTERVAL = int(os.getenv("REPORT_CHECK_INTERVAL", "3600"))  # seconds
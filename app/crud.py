@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased, undefer
+from sqlalchemy import select, union_all
 from datetime import datetime, date
 from app import models
 
@@ -45,7 +46,8 @@ def list_users(db: Session, skip: int = 0, limit: int = 100):
 # -------------------------
 
 def create_resource(db: Session, name: str, type: models.ResourceType, link: str,
-                    chapter_number: int = None, duration: int = None, details: str = None):
+                    chapter_number: int = None, duration: int = None, details: str = None,
+                    course: str = None):
     resource = models.Resource(
         name=name,
         type=type,
@@ -53,6 +55,7 @@ def create_resource(db: Session, name: str, type: models.ResourceType, link: str
         chapter_number=chapter_number,
         duration=duration,
         details=details,
+        course=course,
     )
     db.add(resource)
     db.commit()
@@ -73,7 +76,7 @@ def list_resources(db: Session, skip: int = 0, limit: int = 100):
 def update_resource(db: Session, resource_id: int, name: str = None,
                     type: models.ResourceType = None, link: str = None,
                     chapter_number: int = None, duration: int = None,
-                    details: str = None):
+                    details: str = None, course: str = None):
     resource = db.query(models.Resource).filter(models.Resource.id == resource_id).first()
     if not resource:
         return None
@@ -89,6 +92,8 @@ def update_resource(db: Session, resource_id: int, name: str = None,
         resource.duration = duration
     if details:
         resource.details = details
+    if course:
+        resource.course = course
     db.commit()
     db.refresh(resource)
     return resource
@@ -143,8 +148,25 @@ def complete_log(db: Session, log_id: int, completion_percent: float, outcome: m
     return log
 
 
+def all_logs():
+    """ActivityLog entity that reads across the hot table and the archive."""
+    hot = models.ActivityLog.__table__
+    cold = models.ArchivedActivityLog.__table__
+    logs = union_all(
+        select(*hot.columns),
+        select(*[cold.c[c.name] for c in hot.columns]),
+    ).subquery("all_logs")
+    return aliased(models.ActivityLog, logs)
+
+
+def get_log(db: Session, log_id: int):
+    """Single log from either tier, with its (deferred) notes loaded."""
+    log = all_logs()
+    return db.query(log).options(undefer(log.notes)).filter(log.id == log_id).first()
+
+
 def list_logs(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.ActivityLog).offset(skip).limit(limit).all()
+    return db.query(all_logs()).offset(skip).limit(limit).all()
 
 
 def update_log(db: Session, log_id: int, completion_percent: float = None,
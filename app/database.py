@@ -1,16 +1,109 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.config import DATABASE_URL
+from app.config import DATABASE_URL, DB_PATH, ARCHIVE_DB_PATH
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server only
+    fcntl = None
 
 # Create engine
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 
+# Attach the cold-log archive on every new connection so queries can
+# address its tables as archive.<table>. WAL lets online backups read
+# while requests keep writing.
+@event.listens_for(engine, "connect")
+def attach_archive(dbapi_connection, connection_record):
+    dbapi_connection.execute("ATTACH DATABASE ? AS archive", (ARCHIVE_DB_PATH,))
+    dbapi_connection.execute("PRAGMA main.journal_mode=WAL")
+    dbapi_connection.execute("PRAGMA archive.journal_mode=WAL")
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
 
+# Create tables once. Under gunicorn the master does it before forking and
+# workers inherit the flag; otherwise the file lock makes concurrent workers
+# take turns, so only the first one actually issues DDL.
+def init_db():
+    if os.environ.get("APP_DB_INITIALIZED"):
+        return
+    with open(DB_PATH + ".init.lock", "w") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        Base.metadata.create_all(bind=engine)
+        enable_autoincrement()
+        add_missing_columns()
+        from app.services.archive import (
+            reserve_archived_ids, drop_archived_from_hot, backfill_length_rollups,
+        )
+        reserve_archived_ids()
+        db = SessionLocal()
+        try:
+            drop_archived_from_hot(db)  # finish an interrupted archive run
+            backfill_length_rollups(db)  # logs archived before the table existed
+        finally:
+            db.close()
+    os.environ["APP_DB_INITIALIZED"] = "1"
+
+# SQLite can't ALTER a table into AUTOINCREMENT, so tables created before
+# the option was set are rebuilt: rename, recreate, copy rows, drop the old one
+def enable_autoincrement():
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not table.dialect_options["sqlite"]["autoincrement"] or table.schema:
+                continue
+            sql = conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+            ).scalar()
+            if not sql or "AUTOINCREMENT" in sql.upper():
+                continue
+            old = f"{table.name}_pre_autoincrement"
+            old_columns = {c["name"] for c in inspect(conn).get_columns(table.name)}
+            indexes = conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table.name,),
+            ).scalars().all()
+            for index in indexes:
+                conn.exec_driver_sql(f"DROP INDEX {index}")
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {old}")
+            table.create(conn)
+            columns = ", ".join(
+                c.name for c in table.columns if c.computed is None and c.name in old_columns
+            )
+            conn.exec_driver_sql(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old}")
+            conn.exec_driver_sql(f"DROP TABLE {old}")
+
+# Indexes replaced by wider ones, dropped from existing databases
+OBSOLETE_INDEXES = (
+    "main.ix_activity_logs_actual_minutes",
+    "archive.ix_archive_activity_logs_actual_minutes",
+)
+
+# create_all only creates missing tables, so nullable or generated columns
+# added to existing tables later are added here, along with missing indexes
+def add_missing_columns():
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name, schema=table.schema)}
+            missing = [
+                c for c in table.columns
+                if (c.computed is not None or c.nullable) and c.name not in existing
+            ]
+            name = f"{table.schema}.{table.name}" if table.schema else table.name
+            for column in missing:
+                conn.exec_driver_sql(f"ALTER TABLE {name} ADD COLUMN {CreateColumn(column).compile(engine)}")
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        for index in OBSOLETE_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index}")
+
 # Dependency (for FastAPI routes)
 def get_db():
     db = SessionLocal()
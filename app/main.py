@@ -1,12 +1,14 @@
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
-from app.database import Base, engine
+from app.database import init_db
 from app.routers import users, resources, logs, dashboard
 import os
 from fastapi.staticfiles import StaticFiles
 from app.services import session
-from app.routers import analytics
+from app.routers import analytics, admin, courses, reports
+from app.services import reports as report_jobs
+from app.config import REPORT_SCHEDULER
 
 # Create FastAPI app
 app = FastAPI(title="Accountability App - MVP")
@@ -27,6 +29,9 @@ app.include_router(logs.router)
 app.include_router(dashboard.router)
 app.include_router(session.router)
 app.include_router(analytics.router)
+app.include_router(admin.router)
+app.include_router(courses.router)
+app.include_router(reports.router)
 
 # Root endpoint
 @app.get("/", response_class=HTMLResponse)
@@ -45,5 +50,7 @@ async def health():
 # Create tables on startup
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    init_db()
+    if REPORT_SCHEDULER:
+        report_jobs.start_scheduler()
 
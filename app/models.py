@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, Float, ForeignKey, Date, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Float, ForeignKey, Date, Text, UniqueConstraint, LargeBinary, Computed, Index
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.types import TypeDecorator
 from app.database import Base
+from app.config import NOTES_COMPRESS_THRESHOLD
 import enum
+import zlib
 
 # Enums
 class ResourceType(str, enum.Enum):
@@ -29,6 +32,44 @@ class Outcome(str, enum.Enum):
     breakthrough = "breakthrough"
     other = "other"
 
+class NodeKind(str, enum.Enum):
+    course = "course"
+    part = "part"
+    chapter = "chapter"
+
+# Actual session length in whole minutes, computed by SQLite from the
+# recorded start/end times (virtual generated column, so it can be indexed)
+ACTUAL_MINUTES_SQL = (
+    "CAST(ROUND((julianday(end_time) - julianday(start_time)) * 1440) AS INTEGER)"
+)
+
+# Index on (actual_minutes, time_allocated): covers the actual-time
+# analytics, including actual - planned, so no table rows are read
+ACTUAL_MINUTES_INDEX = "ix_activity_logs_actual_minutes_planned"
+
+# Column types
+class CompressedText(TypeDecorator):
+    """Text stored as-is when short, zlib-compressed bytes when long.
+
+    Plain text rows written before compression was added still read back
+    unchanged, since only BLOB values are decompressed.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        raw = value.encode("utf-8")
+        if len(raw) <= NOTES_COMPRESS_THRESHOLD:
+            return value
+        return zlib.compress(raw)
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, bytes):
+            return zlib.decompress(value).decode("utf-8")
+        return value
+
 # Users
 class User(Base):
     __tablename__ = "users"
@@ -54,6 +95,7 @@ class Resource(Base):
     chapter_number = Column(Integer, nullable=True)
     duration = Column(Integer, nullable=True)  # in minutes
     details = Column(String, nullable=True)    # ✅ renamed from metadata
+    course = Column(String, nullable=True)     # course it's a chapter of (see build_courses)
 
     logs = relationship("ActivityLog", back_populates="resource")
 
@@ -61,6 +103,11 @@ class Resource(Base):
 # Activity Logs
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
+    # Never reuse ids: archived logs keep theirs and share one id space
+    __table_args__ = (
+        Index(ACTUAL_MINUTES_INDEX, "actual_minutes", "time_allocated"),
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -75,13 +122,108 @@ class ActivityLog(Base):
     status = Column(Enum(Status), nullable=True)
     completion_percent = Column(Float, nullable=True)
     outcome = Column(Enum(Outcome), nullable=True)
-    notes = Column(Text, nullable=True)
+    notes = deferred(Column(CompressedText, nullable=True))  # loaded only on access
     xp_earned = Column(Integer, default=0)
     notes_file = Column(String, nullable=True)  # path to uploaded .md file
+    actual_minutes = Column(Integer, Computed(ACTUAL_MINUTES_SQL))
     
     user = relationship("User", back_populates="logs")
     resource = relationship("Resource", back_populates="logs")
 
+# Archived Activity Logs (cold tier, lives in the attached archive database)
+class ArchivedActivityLog(Base):
+    __tablename__ = "activity_logs"
+    __table_args__ = (
+        Index(ACTUAL_MINUTES_INDEX, "actual_minutes", "time_allocated"),
+        {"schema": "archive"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, index=True)
+    resource_id = Column(Integer)
+    chapter_number = Column(Integer, nullable=True)
+    mode = Column(Enum(Mode), nullable=False)
+    goal = Column(String, nullable=True)
+    time_allocated = Column(Integer, nullable=True)
+    start_time = Column(DateTime, nullable=True)
+    end_time = Column(DateTime, nullable=True)
+    date = Column(Date, nullable=True, index=True)
+    status = Column(Enum(Status), nullable=True)
+    completion_percent = Column(Float, nullable=True)
+    outcome = Column(Enum(Outcome), nullable=True)
+    notes = deferred(Column(CompressedText, nullable=True))
+    xp_earned = Column(Integer, default=0)
+    notes_file = Column(String, nullable=True)
+    actual_minutes = Column(Integer, Computed(ACTUAL_MINUTES_SQL))
+
+# Daily rollups of archived logs (per user, date and resource type)
+class LogRollup(Base):
+    __tablename__ = "log_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "date", "resource_type"),
+        {"schema": "archive"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, index=True)
+    date = Column(Date, nullable=False, index=True)
+    resource_type = Column(Enum(ResourceType), nullable=True)
+    sessions = Column(Integer, default=0)  # logs with a time_allocated value
+    minutes = Column(Integer, default=0)
+    xp = Column(Integer, default=0)
+
+# Daily session-length histogram of archived logs (per user, date and
+# time_allocated bucket, see archive.LENGTH_BUCKET_MINUTES)
+class SessionLengthRollup(Base):
+    __tablename__ = "session_length_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "date", "bucket"),
+        {"schema": "archive"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, index=True)
+    date = Column(Date, nullable=False, index=True)
+    bucket = Column(Integer, nullable=False)
+    sessions = Column(Integer, default=0)
+
+# Activity Calendars (one row per user per year)
+class ActivityCalendar(Base):
+    __tablename__ = "activity_calendars"
+    __table_args__ = (UniqueConstraint("user_id", "year"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    year = Column(Integer, nullable=False)
+    days = Column(LargeBinary, nullable=False)     # bitmap, bit N = day N of year active
+    minutes = Column(LargeBinary, nullable=False)  # packed uint16 minutes per day
+
+# Course hierarchy: course -> part -> chapter, stored as a materialized path
+class CourseNode(Base):
+    __tablename__ = "course_nodes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, index=True)              # root node id
+    parent_id = Column(Integer, ForeignKey("course_nodes.id"), nullable=True)
+    kind = Column(Enum(NodeKind), nullable=False)
+    name = Column(String, nullable=False)
+    position = Column(Integer, default=0)
+    path = Column(String, index=True)                    # "<course>/<part>/<chapter>/"
+    resource_id = Column(Integer, ForeignKey("resources.id"), nullable=True, index=True)
+    chapter_count = Column(Integer, default=0)           # chapters at or below this node
+
+    resource = relationship("Resource")
+
+# Completed chapters per user, rolled up onto every ancestor node
+class CourseProgress(Base):
+    __tablename__ = "course_progress"
+    __table_args__ = (UniqueConstraint("user_id", "node_id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    node_id = Column(Integer, ForeignKey("course_nodes.id"))
+    completed = Column(Integer, default=0)
+
 # Badges
 class Badge(Base):
     __tablename__ = "badges"
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from app.services import backup, reports
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def run_backup(handle):
+    try:
+        backup.create_snapshot()
+    finally:
+        backup.release_backup_lock(handle)
+
+
+@router.post("/backup", response_model=dict)
+def start_backup(background_tasks: BackgroundTasks):
+    # Runs in the threadpool after the response; writers aren't blocked (WAL)
+    handle = backup.acquire_backup_lock()
+    if handle is None:
+        raise HTTPException(status_code=409, detail="Backup already running")
+    background_tasks.add_task(run_backup, handle)
+    return {"status": "started"}
+
+
+@router.get("/backups", response_model=list[str])
+def list_backups():
+    return backup.list_snapshots()
+
+
+def run_reports(period: str, handle):
+    try:
+        reports.run_reports(period, force=True)
+    except Exception:
+        reports.logger.exception("Report generation failed (%s)", period)
+    finally:
+        reports.release_run_lock(handle)
+
+
+@router.post("/reports/{period}", response_model=dict)
+def generate_reports(period: str, background_tasks: BackgroundTasks):
+    # Regenerates the last completed period for every user, off the request path
+    if period not in reports.PERIODS:
+        raise HTTPException(status_code=404, detail="Unknown report period")
+    handle = reports.acquire_run_lock()
+    if handle is None:
+        raise HTTPException(status_code=409, detail="Report generation already running")
+    background_tasks.add_task(run_reports, period, handle)
+    return {"status": "started", "period": period}
@@ -3,6 +3,9 @@ from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app import database, models
+from app.services.archive import LENGTH_BUCKET_MINUTES
+from app.services.cache import cache
+from app.services.limits import heavy_routes
 from fastapi.templating import Jinja2Templates
 import os
 
@@ -11,10 +14,43 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
-@router.get("/", response_class=HTMLResponse)
-def analytics_dashboard(request: Request, db: Session = Depends(database.get_db)):
+# Actual-duration histogram: 30-minute buckets, last one open-ended
+BUCKET_MINUTES = 30
+BUCKET_COUNT = 7
+
+# Planned session-length histogram: 0-180 minutes in LENGTH_BUCKET_MINUTES
+# buckets; longer sessions aren't shown
+SESSION_BUCKET_COUNT = 6
+
+
+def actual_duration_stats(db: Session, log) -> tuple:
+    """Actual-time totals for one log table, aggregated by SQLite.
+
+    The range filter (rather than IS NOT NULL) lets SQLite answer every
+    query from the (actual_minutes, time_allocated) covering index.
+    Returns (actual_total, variance_total, variance_count, bucket_counts).
+    """
+    timed = log.actual_minutes >= 0
+    actual_total = db.query(func.sum(log.actual_minutes)).filter(timed).scalar() or 0
+    variance_total, variance_count = (
+        db.query(func.sum(log.actual_minutes - log.time_allocated), func.count())
+        .filter(timed, log.time_allocated.isnot(None))
+        .one()
+    )
+    bucket = func.min(log.actual_minutes // BUCKET_MINUTES, BUCKET_COUNT - 1)
+    buckets = dict(db.query(bucket, func.count()).filter(timed).group_by(bucket).all())
+    return actual_total, variance_total or 0, variance_count, buckets
+
+
+def compute_analytics(db: Session) -> dict:
+    # Hot logs are aggregated directly; the archived period comes from rollups
+    rollup = models.LogRollup
+
     # 1. Total time invested
-    total_time = db.query(func.sum(models.ActivityLog.time_allocated)).scalar() or 0
+    total_time = (
+        (db.query(func.sum(models.ActivityLog.time_allocated)).scalar() or 0)
+        + (db.query(func.sum(rollup.minutes)).scalar() or 0)
+    )
 
     # 2. Time by resource type
     time_by_type = (
@@ -23,32 +59,92 @@ def analytics_dashboard(request: Request, db: Session = Depends(database.get_db)
         .group_by(models.Resource.type)
         .all()
     )
-    time_by_type_data = {rtype: minutes for rtype, minutes in time_by_type}
+    archived_by_type = (
+        db.query(rollup.resource_type, func.sum(rollup.minutes))
+        .filter(rollup.resource_type.isnot(None))
+        .group_by(rollup.resource_type)
+        .all()
+    )
+    time_by_type_data = {}
+    for rtype, minutes in time_by_type + archived_by_type:
+        time_by_type_data[rtype] = time_by_type_data.get(rtype, 0) + (minutes or 0)
 
     # 3. Average session length
-    avg_session = db.query(func.avg(models.ActivityLog.time_allocated)).scalar() or 0
+    sessions = (
+        db.query(func.count(models.ActivityLog.time_allocated)).scalar()
+        + (db.query(func.sum(rollup.sessions)).scalar() or 0)
+    )
+    avg_session = total_time / sessions if sessions else 0
 
-    # 4. All session lengths (for histogram)
-    session_lengths = [
-        row[0] for row in db.query(models.ActivityLog.time_allocated).all() if row[0] is not None
+    # 4. Session length histogram: hot logs bucketed by SQLite, the archived
+    # period from its daily bucket rollups
+    length_bucket = models.ActivityLog.time_allocated // LENGTH_BUCKET_MINUTES
+    hot_lengths = (
+        db.query(length_bucket, func.count())
+        .filter(models.ActivityLog.time_allocated >= 0)
+        .group_by(length_bucket)
+        .all()
+    )
+    lengths = models.SessionLengthRollup
+    archived_lengths = db.query(lengths.bucket, func.sum(lengths.sessions)).group_by(lengths.bucket).all()
+    session_counts = [0] * SESSION_BUCKET_COUNT
+    for i, n in hot_lengths + archived_lengths:
+        if 0 <= i < SESSION_BUCKET_COUNT:
+            session_counts[i] += n
+    session_labels = [
+        f"{i * LENGTH_BUCKET_MINUTES}-{(i + 1) * LENGTH_BUCKET_MINUTES} min"
+        for i in range(SESSION_BUCKET_COUNT)
     ]
 
     # 5. XP growth over time (daily)
     xp_by_date = (
         db.query(models.ActivityLog.date, func.sum(models.ActivityLog.xp_earned))
         .group_by(models.ActivityLog.date)
-        .order_by(models.ActivityLog.date)
         .all()
     )
+    archived_xp = db.query(rollup.date, func.sum(rollup.xp)).group_by(rollup.date).all()
+    xp_totals = {}
+    for day, xp in archived_xp + xp_by_date:
+        xp_totals[day] = xp_totals.get(day, 0) + (xp or 0)
+    xp_by_date = sorted(xp_totals.items(), key=lambda row: (row[0] is not None, row[0]))
     xp_by_date_labels = [str(row[0]) for row in xp_by_date]
     xp_by_date_values = [row[1] for row in xp_by_date]
 
-    return templates.TemplateResponse("analytics.html", {
-        "request": request,
+    # 6. Actual time (from start/end) vs planned, across both tiers
+    actual_time = variance_total = variance_count = 0
+    bucket_counts = [0] * BUCKET_COUNT
+    for log_table in (models.ActivityLog, models.ArchivedActivityLog):
+        actual, variance, count, buckets = actual_duration_stats(db, log_table)
+        actual_time += actual
+        variance_total += variance
+        variance_count += count
+        for i, n in buckets.items():
+            bucket_counts[i] += n
+    avg_variance = variance_total / variance_count if variance_count else 0
+    actual_labels = [
+        f"{i * BUCKET_MINUTES}-{(i + 1) * BUCKET_MINUTES} min" for i in range(BUCKET_COUNT - 1)
+    ] + [f"{(BUCKET_COUNT - 1) * BUCKET_MINUTES}+ min"]
+
+    return {
         "total_time": total_time,
+        "actual_time": actual_time,
+        "avg_variance": avg_variance,
+        "actual_labels": actual_labels,
+        "actual_counts": bucket_counts,
         "avg_session": avg_session,
         "time_by_type": time_by_type_data,
-        "session_lengths": session_lengths,
+        "session_labels": session_labels,
+        "session_counts": session_counts,
         "xp_labels": xp_by_date_labels,
         "xp_values": xp_by_date_values,
-    })
+    }
+
+
+@router.get("/", response_class=HTMLResponse)
+def analytics_dashboard(request: Request, db: Session = Depends(database.get_db)):
+    # Identical concurrent requests share one computation; only that one
+    # computation takes a heavy-route slot
+    context = cache.get_or_compute(
+        "analytics", lambda: heavy_routes.run(compute_analytics, db)
+    )
+    return templates.TemplateResponse("analytics.html", {"request": request, **context})
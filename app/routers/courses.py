@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app import models, database
+from app.services import courses
+
+router = APIRouter(prefix="/courses", tags=["courses"])
+
+@router.get("/", response_model=list[dict])
+def list_courses(db: Session = Depends(database.get_db)):
+    nodes = (
+        db.query(models.CourseNode)
+        .filter(models.CourseNode.kind == models.NodeKind.course)
+        .order_by(models.CourseNode.id)
+        .all()
+    )
+    return [{"id": c.id, "name": c.name, "chapters": c.chapter_count} for c in nodes]
+
+@router.get("/{course_id}/progress", response_model=dict)
+def course_progress(course_id: int, user_id: int = 1, db: Session = Depends(database.get_db)):
+    nodes = courses.course_progress(db, course_id, user_id)
+    if not nodes or nodes[0]["kind"] != models.NodeKind.course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    course, parts = nodes[0], nodes[1:]
+    return {
+        "id": course["id"],
+        "name": course["name"],
+        "user_id": user_id,
+        "chapters": course["chapters"],
+        "completed": course["completed"],
+        "percent": course["percent"],
+        "parts": parts,
+    }
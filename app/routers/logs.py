@@ -3,7 +3,8 @@ from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app import crud, models, database
-from app.services import xp
+from app.services import xp, streaks, courses
+from app.services.limits import heavy_routes
 from fastapi.templating import Jinja2Templates
 import os
 
@@ -15,9 +16,10 @@ templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 # -----------------------
 # UI ROUTE (HTML PAGE)
 # -----------------------
-@router.get("/", response_class=HTMLResponse)
+@router.get("/", response_class=HTMLResponse, dependencies=[Depends(heavy_routes.dependency)])
 def logs_page(request: Request, db: Session = Depends(database.get_db)):
-    logs = db.query(models.ActivityLog).order_by(models.ActivityLog.date.desc()).all()
+    log = crud.all_logs()
+    logs = db.query(log).order_by(log.date.desc()).all()
     return templates.TemplateResponse("logs.html", {
         "request": request,
         "logs": logs
@@ -37,6 +39,8 @@ def create_log(user_id: int, resource_id: int, mode: models.Mode, goal: str = No
 @router.post("/{log_id}/complete", response_model=dict)
 def complete_log(log_id: int, completion_percent: float, outcome: models.Outcome, notes: str = None,
                  db: Session = Depends(database.get_db)):
+    existing = db.query(models.ActivityLog.status).filter(models.ActivityLog.id == log_id).scalar()
+    first_completion = existing != models.Status.completed
     log = crud.complete_log(db, log_id, completion_percent, outcome, notes)
     if not log:
         raise HTTPException(status_code=404, detail="Log not found")
@@ -46,6 +50,12 @@ def complete_log(log_id: int, completion_percent: float, outcome: models.Outcome
     xp_total = xp.calculate_xp(log)
     log.xp_earned = xp_total
     xp.update_user_progress(user, xp_total)
+    # Mark the day on the activity calendar (once per log)
+    if first_completion:
+        streaks.record_activity(db, user.id, log.date or log.end_time.date(), log.time_allocated)
+        streaks.sync_streaks(db, user)
+    if log.completion_percent >= courses.CHAPTER_DONE_PERCENT:
+        courses.record_chapter_completion(db, user.id, log.resource_id)
 
     db.commit()
     db.refresh(log)
@@ -78,13 +88,42 @@ def list_logs(db: Session = Depends(database.get_db)):
     ]
 
 
+@router.get("/{log_id}", response_model=dict)
+def get_log(log_id: int, db: Session = Depends(database.get_db)):
+    log = crud.get_log(db, log_id)
+    if not log:
+        raise HTTPException(status_code=404, detail="Log not found")
+    return {
+        "id": log.id,
+        "user_id": log.user_id,
+        "resource_id": log.resource_id,
+        "goal": log.goal,
+        "mode": log.mode,
+        "status": log.status,
+        "completion_percent": log.completion_percent,
+        "outcome": log.outcome,
+        "xp": log.xp_earned,
+        "notes": log.notes,
+        "notes_file": log.notes_file,
+    }
+
+
 @router.put("/{log_id}", response_model=dict)
 def update_log(log_id: int, completion_percent: float = None,
                outcome: models.Outcome = None, notes: str = None,
                db: Session = Depends(database.get_db)):
+    previous = db.query(models.ActivityLog.completion_percent).filter(models.ActivityLog.id == log_id).scalar()
     log = crud.update_log(db, log_id, completion_percent, outcome, notes)
     if not log:
         raise HTTPException(status_code=404, detail="Log not found")
+
+    # Keep course progress in step with the edited completion
+    if completion_percent is not None and log.status == models.Status.completed:
+        if log.completion_percent >= courses.CHAPTER_DONE_PERCENT:
+            courses.record_chapter_completion(db, log.user_id, log.resource_id)
+        elif (previous or 0) >= courses.CHAPTER_DONE_PERCENT:
+            courses.rebuild_progress(db, log.user_id)
+        db.commit()
     return {"id": log.id, "completion_percent": log.completion_percent,
             "outcome": log.outcome, "notes": log.notes}
 
@@ -94,4 +133,12 @@ def delete_log(log_id: int, db: Session = Depends(database.get_db)):
     log = crud.delete_log(db, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Log not found")
+    if log.status == models.Status.completed:
+        streaks.rebuild_calendar(db, log.user_id)
+        user = crud.get_user(db, log.user_id)
+        if user:
+            streaks.sync_streaks(db, user)
+        if (log.completion_percent or 0) >= courses.CHAPTER_DONE_PERCENT:
+            courses.rebuild_progress(db, log.user_id)
+        db.commit()
     return {"message": f"Log {log_id} deleted"}
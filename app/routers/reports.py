@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from app.services import reports
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+# Reports are pre-rendered by the background worker; these routes only serve files
+@router.get("/{user_id}/{period}")
+def latest_report(user_id: int, period: str, format: str = "html"):
+    if period not in reports.PERIODS or format not in ("html", "json"):
+        raise HTTPException(status_code=404, detail="Report not found")
+    path = reports.latest_report(user_id, period, format)
+    if not path:
+        raise HTTPException(status_code=404, detail="Report not generated yet")
+    return FileResponse(path)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from app import crud, models, database
+from app.services.cache import cache
 from fastapi.templating import Jinja2Templates
 import os
 
@@ -28,17 +29,19 @@ def resources_page(request: Request, db: Session = Depends(database.get_db)):
 @router.post("/api", response_model=dict)
 def create_resource(name: str, type: models.ResourceType, link: str,
                     chapter_number: int | None = None, duration: int | None = None,
+                    details: str | None = None, course: str | None = None,
                     db: Session = Depends(database.get_db)):
-    resource = crud.create_resource(db, name, type, link, chapter_number, duration)
+    resource = crud.create_resource(db, name, type, link, chapter_number, duration, details, course)
     return {"id": resource.id, "name": resource.name, "type": resource.type, "link": resource.link}
 
 @router.get("/api", response_model=list[dict])
 def list_resources_api(db: Session = Depends(database.get_db)):
-    resources = crud.list_resources(db)
-    return [
-        {"id": r.id, "name": r.name, "type": r.type, "link": r.link, "chapter_number": r.chapter_number}
-        for r in resources
-    ]
+    def load():
+        return [
+            {"id": r.id, "name": r.name, "type": r.type, "link": r.link, "chapter_number": r.chapter_number}
+            for r in crud.list_resources(db)
+        ]
+    return cache.get_or_compute("resources_api", load)
 
 @router.put("/api/{resource_id}", response_model=dict)
 def update_resource(resource_id: int,
@@ -48,8 +51,9 @@ def update_resource(resource_id: int,
                     chapter_number: int = None,
                     duration: int = None,
                     details: str = None,
+                    course: str = None,
                     db: Session = Depends(database.get_db)):
-    resource = crud.update_resource(db, resource_id, name, type, link, chapter_number, duration, details)
+    resource = crud.update_resource(db, resource_id, name, type, link, chapter_number, duration, details, course)
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
     return {
@@ -60,6 +64,7 @@ def update_resource(resource_id: int,
         "chapter_number": resource.chapter_number,
         "duration": resource.duration,
         "details": resource.details,
+        "course": resource.course,
     }
 
 @router.delete("/api/{resource_id}", response_model=dict)
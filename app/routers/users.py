@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app import crud, models, database
+from app.services import streaks
+from app.services.cache import cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -11,8 +14,9 @@ def create_user(name: str, db: Session = Depends(database.get_db)):
 
 @router.get("/", response_model=list[dict])
 def list_users(db: Session = Depends(database.get_db)):
-    users = crud.list_users(db)
-    return [{"id": u.id, "name": u.name, "xp": u.xp, "level": u.level} for u in users]
+    def load():
+        return [{"id": u.id, "name": u.name, "xp": u.xp, "level": u.level} for u in crud.list_users(db)]
+    return cache.get_or_compute("users_api", load)
 
 @router.get("/{user_id}", response_model=dict)
 def get_user(user_id: int, db: Session = Depends(database.get_db)):
@@ -21,6 +25,21 @@ def get_user(user_id: int, db: Session = Depends(database.get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     return {"id": user.id, "name": user.name, "xp": user.xp, "level": user.level}
 
+@router.get("/{user_id}/calendar", response_model=dict)
+def get_calendar(user_id: int, year: int = Query(None, ge=1, le=9999), db: Session = Depends(database.get_db)):
+    user = crud.get_user(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    year = year or date.today().year
+    current, longest = streaks.streaks(db, user_id)
+    return {
+        "user_id": user_id,
+        "year": year,
+        "current_streak": current,
+        "longest_streak": longest,
+        "weeks": streaks.heatmap(db, user_id, year),
+    }
+
 @router.put("/{user_id}", response_model=dict)
 def update_user(user_id: int, name: str, db: Session = Depends(database.get_db)):
     user = crud.update_user(db, user_id, name)
@@ -0,0 +1,141 @@
+from datetime import date, timedelta
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app import models
+from app.config import ARCHIVE_AFTER_DAYS
+from app.database import engine
+
+# Width of the session-length histogram buckets kept for archived logs
+LENGTH_BUCKET_MINUTES = 30
+
+
+def drop_archived_from_hot(db: Session) -> int:
+    """Delete hot logs that are already in the archive (commits).
+
+    Finishes a run that copied rows but crashed before deleting them. Log
+    ids are unique across both tiers, so a matching id is the same log.
+    """
+    hot = models.ActivityLog.__table__
+    cold = models.ArchivedActivityLog.__table__
+    removed = db.execute(hot.delete().where(hot.c.id.in_(select(cold.c.id)))).rowcount
+    db.commit()
+    return removed
+
+
+def add_length_rollups(db: Session, logs, where=None):
+    """Add the logs' session-length bucket counts to the daily rollups (no commit)."""
+    bucket = logs.c.time_allocated // LENGTH_BUCKET_MINUTES
+    timed = logs.c.time_allocated >= 0
+    rows = db.execute(
+        select(logs.c.user_id, logs.c.date, bucket, func.count())
+        .where(timed if where is None else timed & where)
+        .group_by(logs.c.user_id, logs.c.date, bucket)
+    ).all()
+
+    lengths = models.SessionLengthRollup.__table__
+    for user_id, day, index, sessions in rows:
+        stmt = sqlite_insert(lengths).values(user_id=user_id, date=day, bucket=index, sessions=sessions)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "date", "bucket"],
+            set_={"sessions": lengths.c.sessions + stmt.excluded.sessions},
+        ))
+
+
+def backfill_length_rollups(db: Session):
+    """Build the session-length rollups from logs archived before they existed (commits).
+
+    Does nothing once any rollup exists, so it's cheap to call on startup
+    and before every archive run.
+    """
+    if db.query(models.SessionLengthRollup.id).first():
+        return
+    add_length_rollups(db, models.ArchivedActivityLog.__table__)
+    db.commit()
+
+
+def archive_logs(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS) -> int:
+    """Move completed logs older than the horizon into the archive tier.
+
+    Daily rollups (totals and session-length buckets) are written for the
+    moved logs so analytics never has to scan archived rows. Returns the number of logs archived.
+
+    In WAL mode a commit spanning the main and archive files is not atomic
+    as a whole, so the move is two single-file transactions: copy rows and
+    their rollups into the archive, then delete the copied ids from the hot
+    table. Rerunning after a crash between the two only does the delete.
+    """
+    drop_archived_from_hot(db)
+    backfill_length_rollups(db)
+
+    cutoff = date.today() - timedelta(days=older_than_days)
+    hot = models.ActivityLog.__table__
+    stale = (hot.c.date < cutoff) & (hot.c.status == models.Status.completed)
+
+    # 1. Rollups for the logs being copied (archive file only)
+    rollups = db.execute(
+        select(
+            hot.c.user_id,
+            hot.c.date,
+            models.Resource.type,
+            func.count(hot.c.time_allocated),
+            func.coalesce(func.sum(hot.c.time_allocated), 0),
+            func.coalesce(func.sum(hot.c.xp_earned), 0),
+        )
+        .outerjoin(models.Resource, hot.c.resource_id == models.Resource.id)
+        .where(stale)
+        .group_by(hot.c.user_id, hot.c.date, models.Resource.type)
+    ).all()
+
+    rollup = models.LogRollup.__table__
+    for user_id, day, rtype, sessions, minutes, xp in rollups:
+        stmt = sqlite_insert(rollup).values(
+            user_id=user_id, date=day, resource_type=rtype,
+            sessions=sessions, minutes=minutes, xp=xp,
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "date", "resource_type"],
+            set_={
+                "sessions": rollup.c.sessions + stmt.excluded.sessions,
+                "minutes": rollup.c.minutes + stmt.excluded.minutes,
+                "xp": rollup.c.xp + stmt.excluded.xp,
+            },
+        ))
+
+    add_length_rollups(db, hot, stale)
+
+    # 2. Copy rows to the archive in the same (archive-only) transaction
+    columns = [c.name for c in hot.columns if c.computed is None]
+    moved = db.execute(
+        insert(models.ArchivedActivityLog.__table__).from_select(
+            columns, select(*[hot.c[name] for name in columns]).where(stale)
+        )
+    ).rowcount
+    db.commit()
+
+    # 3. Drop the copied rows from the hot table
+    drop_archived_from_hot(db)
+    return moved
+
+
+def reserve_archived_ids():
+    """Make sure new hot logs get ids above every archived one.
+
+    Only matters for databases created before activity_logs used
+    AUTOINCREMENT, where ids of archived rows could be handed out again.
+    """
+    with engine.begin() as conn:
+        highest = conn.execute(
+            select(func.max(models.ArchivedActivityLog.id))
+        ).scalar() or 0
+        current = conn.exec_driver_sql(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'activity_logs'"
+        ).scalar()
+        if current is not None and current >= highest:
+            return
+        hot_max = conn.execute(select(func.max(models.ActivityLog.id))).scalar() or 0
+        conn.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = 'activity_logs'")
+        conn.exec_driver_sql(
+            "INSERT INTO sqlite_sequence (name, seq) VALUES ('activity_logs', ?)",
+            (max(highest, hot_max),),
+        )
@@ -0,0 +1,171 @@
+import glob
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from app.config import DB_PATH, ARCHIVE_DB_PATH, BACKUP_DIR, BACKUP_KEEP
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process guard applies
+    fcntl = None
+
+# Snapshot name prefix -> live database file. A snapshot is one file per
+# database, all sharing the same timestamp.
+DATABASES = {
+    "accountability": DB_PATH,
+    "archive": ARCHIVE_DB_PATH,
+}
+
+# Only one backup runs at a time (threads here, processes via flock)
+backup_lock = threading.Lock()
+
+
+def _copy_snapshot(targets: dict[str, str]):
+    """Copy both live databases as of a single point in time.
+
+    One connection opens a read transaction across main and the attached
+    archive, then copies each schema with a single backup step. In WAL mode
+    the read transaction doesn't block writers, and because the copy is one
+    step on the connection holding the snapshot, concurrent commits can't
+    restart it (a multi-step backup from its own connection restarts from
+    page 0 after every foreign commit).
+    """
+    src = sqlite3.connect(DB_PATH, isolation_level=None)
+    try:
+        src.execute("ATTACH DATABASE ? AS archive", (ARCHIVE_DB_PATH,))
+        src.execute("BEGIN")
+        # Start the read transaction on both files before copying either
+        src.execute("SELECT count(*) FROM main.sqlite_master").fetchone()
+        src.execute("SELECT count(*) FROM archive.sqlite_master").fetchone()
+        for prefix, schema in (("accountability", "main"), ("archive", "archive")):
+            dest = sqlite3.connect(targets[prefix])
+            try:
+                src.backup(dest, pages=-1, name=schema)
+            finally:
+                dest.close()
+        src.execute("COMMIT")
+    finally:
+        src.close()
+
+
+def acquire_backup_lock():
+    """Claim the single backup slot across all worker processes.
+
+    Returns a handle for release_backup_lock, or None if a backup is running.
+    """
+    if not backup_lock.acquire(blocking=False):
+        return None
+    handle = open(DB_PATH + ".backup.lock", "w")
+    if fcntl:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            backup_lock.release()
+            return None
+    return handle
+
+
+def release_backup_lock(handle):
+    handle.close()  # closing the file drops the flock
+    backup_lock.release()
+
+
+def _rotate(prefix: str, keep: int = BACKUP_KEEP):
+    snapshots = sorted(glob.glob(os.path.join(BACKUP_DIR, f"{prefix}-*.db.gz")))
+    for old in snapshots[:max(len(snapshots) - keep, 0)]:
+        os.remove(old)
+
+
+def create_snapshot() -> list[str]:
+    """Back up every database to gzip snapshots sharing one timestamp. Returns the new paths."""
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    created = []
+    with tempfile.TemporaryDirectory(dir=BACKUP_DIR) as tmp:
+        raw = {prefix: os.path.join(tmp, f"{prefix}.db") for prefix in DATABASES}
+        _copy_snapshot(raw)
+        for prefix in DATABASES:
+            target = os.path.join(BACKUP_DIR, f"{prefix}-{stamp}.db.gz")
+            partial = target + ".tmp"
+            try:
+                with open(raw[prefix], "rb") as f_in, gzip.open(partial, "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+                os.replace(partial, target)  # never list or rotate a partial snapshot
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+            created.append(target)
+    for prefix in DATABASES:
+        _rotate(prefix)
+    return created
+
+
+def list_snapshots() -> list[str]:
+    return sorted(os.path.basename(p) for p in glob.glob(os.path.join(BACKUP_DIR, "*.db.gz")))
+
+
+def _snapshot_stamp(snapshot: str) -> str:
+    """Timestamp of a snapshot given as a file name/path or as the bare timestamp."""
+    name = os.path.basename(snapshot)
+    for prefix in DATABASES:
+        if name.startswith(f"{prefix}-") and name.endswith(".db.gz"):
+            return name[len(prefix) + 1:-len(".db.gz")]
+    if name.endswith(".db.gz"):
+        raise ValueError(f"Unknown snapshot: {name}")
+    return name
+
+
+def _verify(path: str, name: str):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        result = str(e)
+    finally:
+        conn.close()
+    if result != "ok":
+        raise ValueError(f"Integrity check failed for {name}: {result}")
+
+
+def restore_snapshot(snapshot: str) -> list[str]:
+    """Restore a snapshot set over the live databases after integrity checks.
+
+    `snapshot` is either file of the set or its timestamp; every database of
+    the set must be present and pass PRAGMA integrity_check before anything
+    is overwritten, so the hot and archive tiers always come from the same
+    moment. Run with the server stopped. Raises ValueError on a missing or
+    corrupt file. Returns the restored database paths.
+    """
+    stamp = _snapshot_stamp(snapshot)
+    directory = os.path.dirname(snapshot) if os.path.exists(snapshot) else BACKUP_DIR
+    files = {prefix: os.path.join(directory, f"{prefix}-{stamp}.db.gz") for prefix in DATABASES}
+    missing = [os.path.basename(p) for p in files.values() if not os.path.exists(p)]
+    if missing:
+        raise ValueError(f"Incomplete snapshot set {stamp}: missing {', '.join(missing)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = {}
+        for prefix, path in files.items():
+            name = os.path.basename(path)
+            raw[prefix] = os.path.join(tmp, f"{prefix}.db")
+            try:
+                with gzip.open(path, "rb") as f_in, open(raw[prefix], "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+            except (gzip.BadGzipFile, EOFError) as e:
+                raise ValueError(f"Corrupt snapshot {name}: {e}")
+            _verify(raw[prefix], name)
+
+        for prefix, live in DATABASES.items():
+            src = sqlite3.connect(raw[prefix])
+            dest = sqlite3.connect(live)
+            try:
+                src.backup(dest)
+            finally:
+                dest.close()
+                src.close()
+    return list(DATABASES.values())
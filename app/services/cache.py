@@ -0,0 +1,79 @@
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future
+from app.config import DB_PATH, ARCHIVE_DB_PATH
+
+
+class DataVersionCache:
+    """Per-process cache that is dropped whenever any connection commits.
+
+    A dedicated read-only connection polls ``PRAGMA data_version``, which
+    changes when another connection (in this or any other worker process)
+    commits to the database. That makes it a cheap cross-process
+    invalidation signal: one pragma per lookup, no shared memory.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, archive_path: str = ARCHIVE_DB_PATH):
+        self.db_path = db_path
+        self.archive_path = archive_path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._version = None
+        self._values = {}
+        self._inflight = {}
+
+    def _connection(self):
+        # Reopen after a fork so workers never share the parent's handle
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path,))
+            self._pid = os.getpid()
+            self._version = None
+            self._values = {}
+        return self._conn
+
+    def _data_version(self):
+        conn = self._connection()
+        return (
+            conn.execute("PRAGMA main.data_version").fetchone()[0],
+            conn.execute("PRAGMA archive.data_version").fetchone()[0],
+        )
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            version = self._data_version()
+            if version != self._version:
+                self._values = {}
+                self._version = version
+            if key in self._values:
+                return self._values[key]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            # Only keep it if nothing was committed while computing
+            if self._data_version() == version:
+                self._values[key] = value
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values = {}
+
+
+cache = DataVersionCache()
@@ -0,0 +1,210 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app import crud, models
+
+# A chapter counts as done once a completed log reaches this percentage
+CHAPTER_DONE_PERCENT = 100
+
+
+def ancestor_ids(node: models.CourseNode) -> list[int]:
+    """Ids from the course root down to (and including) the node."""
+    return [int(i) for i in node.path.strip("/").split("/")]
+
+
+def create_node(db: Session, name: str, kind: models.NodeKind,
+                parent: models.CourseNode = None, resource_id: int = None,
+                position: int = 0) -> models.CourseNode:
+    """Add a node under `parent` (no commit). Chapters bump every ancestor's chapter_count."""
+    node = models.CourseNode(
+        name=name,
+        kind=kind,
+        parent_id=parent.id if parent else None,
+        resource_id=resource_id,
+        position=position,
+        chapter_count=1 if kind == models.NodeKind.chapter else 0,
+    )
+    db.add(node)
+    db.flush()  # assigns node.id
+    node.path = f"{parent.path if parent else ''}{node.id}/"
+    node.course_id = parent.course_id if parent else node.id
+
+    if kind == models.NodeKind.chapter and parent:
+        db.query(models.CourseNode).filter(models.CourseNode.id.in_(ancestor_ids(parent))).update(
+            {models.CourseNode.chapter_count: models.CourseNode.chapter_count + 1},
+            synchronize_session=False,
+        )
+    return node
+
+
+def remove_chapter(db: Session, chapter: models.CourseNode):
+    """Delete a chapter and its progress rows, un-counting it on every ancestor (no commit).
+
+    Ancestors' progress rollups aren't adjusted; rebuild them afterwards.
+    """
+    ancestors = ancestor_ids(chapter)[:-1]
+    db.query(models.CourseNode).filter(models.CourseNode.id.in_(ancestors)).update(
+        {models.CourseNode.chapter_count: models.CourseNode.chapter_count - 1},
+        synchronize_session=False,
+    )
+    db.query(models.CourseProgress).filter(models.CourseProgress.node_id == chapter.id).delete()
+    db.delete(chapter)
+
+
+def build_course(db: Session, name: str, resources: list[models.Resource]) -> models.CourseNode:
+    """Create the course, or bring an existing one of that name up to date.
+
+    One part per distinct `details` value; if every resource shares the
+    same details, chapters hang directly off the course. Chapters are
+    ordered by chapter_number, then id. Existing nodes keep their ids: new
+    resources are appended, chapters whose resource left the course are
+    removed, as are parts left empty. Rebuild progress afterwards.
+    """
+    course = (
+        db.query(models.CourseNode)
+        .filter(models.CourseNode.kind == models.NodeKind.course, models.CourseNode.name == name)
+        .first()
+    ) or create_node(db, name, models.NodeKind.course)
+    nodes = db.query(models.CourseNode).filter(models.CourseNode.course_id == course.id).all()
+    parts = {n.name: n for n in nodes if n.kind == models.NodeKind.part}
+    chapters = {n.resource_id: n for n in nodes if n.kind == models.NodeKind.chapter}
+    next_position = {}
+    for n in nodes:
+        if n.parent_id is not None:
+            next_position[n.parent_id] = max(next_position.get(n.parent_id, 0), n.position + 1)
+
+    resources = sorted(resources, key=lambda r: (r.chapter_number or 0, r.id))
+    wanted = {r.id for r in resources}
+    for resource_id, chapter in chapters.items():
+        if resource_id not in wanted:
+            remove_chapter(db, chapter)
+
+    groups = {}
+    for r in resources:
+        groups.setdefault(r.details or "", []).append(r)
+    flat = not parts and len(groups) <= 1
+
+    for key, members in groups.items():
+        if flat:
+            parent = course
+        else:
+            parent = parts.get(key or "Other")
+            if parent is None:
+                parent = parts[key or "Other"] = create_node(
+                    db, key or "Other", models.NodeKind.part, course, position=next_position.get(course.id, 0)
+                )
+                next_position[course.id] = parent.position + 1
+        for r in members:
+            if r.id in chapters:
+                continue
+            position = next_position.get(parent.id, 0)
+            create_node(db, r.name, models.NodeKind.chapter, parent, resource_id=r.id, position=position)
+            next_position[parent.id] = position + 1
+
+    db.flush()
+    db.query(models.CourseNode).filter(
+        models.CourseNode.course_id == course.id,
+        models.CourseNode.kind == models.NodeKind.part,
+        models.CourseNode.chapter_count == 0,
+    ).delete(synchronize_session=False)
+    db.commit()
+    db.refresh(course)
+    return course
+
+
+def remove_course(db: Session, course: models.CourseNode):
+    """Delete a course with all its nodes and progress rows (no commit)."""
+    node_ids = db.query(models.CourseNode.id).filter(models.CourseNode.course_id == course.id)
+    db.query(models.CourseProgress).filter(models.CourseProgress.node_id.in_(node_ids)).delete(
+        synchronize_session=False
+    )
+    db.query(models.CourseNode).filter(models.CourseNode.course_id == course.id).delete(
+        synchronize_session=False
+    )
+
+
+def record_chapter_completion(db: Session, user_id: int, resource_id: int):
+    """Mark the resource's chapters done for the user and roll up (no commit)."""
+    chapters = (
+        db.query(models.CourseNode)
+        .filter(models.CourseNode.resource_id == resource_id,
+                models.CourseNode.kind == models.NodeKind.chapter)
+        .all()
+    )
+    progress = models.CourseProgress.__table__
+    for chapter in chapters:
+        done = (
+            db.query(models.CourseProgress.id)
+            .filter(models.CourseProgress.user_id == user_id,
+                    models.CourseProgress.node_id == chapter.id)
+            .first()
+        )
+        if done:
+            continue
+        for node_id in ancestor_ids(chapter):
+            stmt = sqlite_insert(progress).values(user_id=user_id, node_id=node_id, completed=1)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["user_id", "node_id"],
+                set_={"completed": progress.c.completed + 1},
+            ))
+
+
+def _finished_chapters(db: Session, user_id: int = None):
+    """Distinct (user_id, resource_id) pairs with a completed log at CHAPTER_DONE_PERCENT."""
+    log = crud.all_logs()
+    query = db.query(log.user_id, log.resource_id).filter(
+        log.status == models.Status.completed,
+        log.completion_percent >= CHAPTER_DONE_PERCENT,
+    )
+    if user_id is not None:
+        query = query.filter(log.user_id == user_id)
+    return query.distinct().all()
+
+
+def rebuild_progress(db: Session, user_id: int):
+    """Recompute one user's rollups from their completed logs (no commit).
+
+    Used when a log stops counting (deleted, or edited below
+    CHAPTER_DONE_PERCENT), since rollups can't tell which log set them.
+    """
+    db.query(models.CourseProgress).filter(models.CourseProgress.user_id == user_id).delete()
+    for _, resource_id in _finished_chapters(db, user_id):
+        record_chapter_completion(db, user_id, resource_id)
+
+
+def backfill_progress(db: Session):
+    """Rebuild every user's rollups from completed logs."""
+    db.query(models.CourseProgress).delete()
+    for user_id, resource_id in _finished_chapters(db):
+        record_chapter_completion(db, user_id, resource_id)
+    db.commit()
+
+
+def course_progress(db: Session, course_id: int, user_id: int) -> list[dict]:
+    """Completion of the course and its parts for one user.
+
+    Reads the precomputed rollups: one row per course/part, no tree walk.
+    """
+    rows = (
+        db.query(models.CourseNode, func.coalesce(models.CourseProgress.completed, 0))
+        .outerjoin(
+            models.CourseProgress,
+            (models.CourseProgress.node_id == models.CourseNode.id)
+            & (models.CourseProgress.user_id == user_id),
+        )
+        .filter(models.CourseNode.course_id == course_id,
+                models.CourseNode.kind != models.NodeKind.chapter)
+        .order_by(models.CourseNode.parent_id.isnot(None), models.CourseNode.position)
+        .all()
+    )
+    return [
+        {
+            "id": node.id,
+            "name": node.name,
+            "kind": node.kind,
+            "chapters": node.chapter_count,
+            "completed": completed,
+            "percent": round(100 * completed / node.chapter_count, 1) if node.chapter_count else 0.0,
+        }
+        for node, completed in rows
+    ]
@@ -0,0 +1,43 @@
+import threading
+from fastapi import HTTPException
+from app.config import HEAVY_ROUTE_LIMIT, HEAVY_ROUTE_WAIT, HEAVY_ROUTE_RETRY_AFTER
+
+
+class ConcurrencyLimit:
+    """Bounded semaphore for expensive work.
+
+    Callers queue for up to `wait` seconds; after that the request is
+    rejected with 503 and a Retry-After header instead of piling onto
+    SQLite.
+    """
+
+    def __init__(self, limit: int = HEAVY_ROUTE_LIMIT, wait: float = HEAVY_ROUTE_WAIT,
+                 retry_after: int = HEAVY_ROUTE_RETRY_AFTER):
+        self._slots = threading.BoundedSemaphore(limit)
+        self.wait = wait
+        self.retry_after = retry_after
+
+    def __enter__(self):
+        if not self._slots.acquire(timeout=self.wait):
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, try again shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+
+    def run(self, func, *args, **kwargs):
+        with self:
+            return func(*args, **kwargs)
+
+    def dependency(self):
+        # For use as Depends(limit.dependency): holds a slot for the request
+        with self:
+            yield
+
+
+# Shared by all heavy routes
+heavy_routes = ConcurrencyLimit()
@@ -0,0 +1,215 @@
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app import crud, models
+from app.config import REPORTS_DIR, REPORT_WORKERS, REPORT_CHECK_INTERVAL, DB_PATH
+from app.database import SessionLocal
+from app.services import streaks
+
+try:
+    import fcntl
+except ImportError:  # Windows: no scheduler lock, run reports via the CLI
+    fcntl = None
+
+PERIODS = ("weekly", "monthly")
+REVIEW_OUTCOMES = (models.Outcome.needs_review, models.Outcome.confused)
+
+logger = logging.getLogger(__name__)
+
+# Held open by the process that runs the scheduler
+_scheduler_lock = None
+
+# Guards against overlapping report runs (threads here, processes via flock)
+_run_lock = threading.Lock()
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+
+def last_period(period: str, today: date = None) -> tuple[date, date]:
+    """Most recent completed period as [start, end): Monday-based weeks, calendar months."""
+    today = today or date.today()
+    if period == "weekly":
+        end = today - timedelta(days=today.weekday())
+        return end - timedelta(days=7), end
+    if period == "monthly":
+        end = today.replace(day=1)
+        return (end - timedelta(days=1)).replace(day=1), end
+    raise ValueError(f"Unknown period: {period}")
+
+
+def report_path(user_id: int, period: str, start: date, ext: str) -> str:
+    return os.path.join(REPORTS_DIR, str(user_id), f"{period}-{start}.{ext}")
+
+
+def latest_report(user_id: int, period: str, ext: str):
+    """Path of the newest generated report, or None."""
+    found = sorted(glob.glob(os.path.join(REPORTS_DIR, str(user_id), f"{period}-*.{ext}")))
+    return found[-1] if found else None
+
+
+def collect_digest(db: Session, user: models.User, period: str, start: date, end: date) -> dict:
+    log = crud.all_logs()
+    in_period = (log.user_id == user.id) & (log.date >= start) & (log.date < end)
+
+    minutes, sessions, xp_gained = (
+        db.query(func.coalesce(func.sum(log.time_allocated), 0), func.count(log.id),
+                 func.coalesce(func.sum(log.xp_earned), 0))
+        .filter(in_period)
+        .one()
+    )
+    time_by_type = (
+        db.query(models.Resource.type, func.sum(log.time_allocated))
+        .join(models.Resource, log.resource_id == models.Resource.id)
+        .filter(in_period)
+        .group_by(models.Resource.type)
+        .all()
+    )
+
+    # Resources whose latest completed log (up to the period end) left them unclear
+    latest = (
+        db.query(func.max(log.id))
+        .filter(log.user_id == user.id, log.status == models.Status.completed, log.date < end)
+        .group_by(log.resource_id)
+    )
+    review = (
+        db.query(models.Resource.name, log.outcome, log.date)
+        .join(models.Resource, log.resource_id == models.Resource.id)
+        .filter(log.id.in_(latest), log.outcome.in_(REVIEW_OUTCOMES))
+        .order_by(log.date)
+        .all()
+    )
+
+    current, longest = streaks.streaks(db, user.id, today=end - timedelta(days=1))
+    return {
+        "user": {"id": user.id, "name": user.name},
+        "period": period,
+        "start": str(start),
+        "end": str(end - timedelta(days=1)),
+        "total_minutes": minutes,
+        "sessions": sessions,
+        "xp_gained": xp_gained,
+        "time_by_type": {rtype.value: total or 0 for rtype, total in time_by_type},
+        "current_streak": current,
+        "longest_streak": longest,
+        "due_for_review": [
+            {"name": name, "outcome": outcome.value, "date": str(day)} for name, outcome, day in review
+        ],
+    }
+
+
+def generate_report(user_id: int, period: str, start: date, end: date) -> str:
+    """Build one user's digest and write it as JSON and HTML. Runs in a worker process."""
+    db = SessionLocal()
+    try:
+        user = crud.get_user(db, user_id)
+        report = collect_digest(db, user, period, start, end)
+    finally:
+        db.close()
+
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape())
+    html = env.get_template("digest.html").render(report=report)
+
+    os.makedirs(os.path.dirname(report_path(user_id, period, start, "json")), exist_ok=True)
+    for ext, body in (("json", json.dumps(report, indent=2)), ("html", html)):
+        target = report_path(user_id, period, start, ext)
+        with open(target + ".tmp", "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(target + ".tmp", target)  # readers never see a partial file
+    return report_path(user_id, period, start, "html")
+
+
+def _lower_priority():
+    # Worker processes yield the CPU to request handlers
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+def run_reports(period: str, today: date = None, force: bool = False) -> list[str]:
+    """Generate the last completed period's digest for every user in a process pool.
+
+    Reports that already exist are skipped unless `force` is set.
+    """
+    start, end = last_period(period, today)
+    db = SessionLocal()
+    try:
+        user_ids = [u.id for u in db.query(models.User.id).all()]
+    finally:
+        db.close()
+    if not force:
+        user_ids = [u for u in user_ids if not os.path.exists(report_path(u, period, start, "html"))]
+    if not user_ids:
+        return []
+
+    # spawn: workers open their own SQLite connections instead of inheriting ours
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=REPORT_WORKERS, mp_context=ctx,
+                             initializer=_lower_priority) as pool:
+        futures = [pool.submit(generate_report, u, period, start, end) for u in user_ids]
+        return [f.result() for f in futures]
+
+
+def acquire_run_lock():
+    """Claim the single report-run slot across all worker processes.
+
+    Returns a handle for release_run_lock, or None if a run is in progress.
+    """
+    if not _run_lock.acquire(blocking=False):
+        return None
+    handle = open(DB_PATH + ".reports-run.lock", "w")
+    if fcntl:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            _run_lock.release()
+            return None
+    return handle
+
+
+def release_run_lock(handle):
+    handle.close()  # closing the file drops the flock
+    _run_lock.release()
+
+
+def _scheduler_loop():
+    while True:
+        for period in PERIODS:
+            handle = acquire_run_lock()
+            if handle is None:
+                logger.info("Skipping %s reports: a run is already in progress", period)
+                continue
+            try:
+                run_reports(period)
+            except Exception:
+                logger.exception("Report generation failed (%s)", period)
+            finally:
+                release_run_lock(handle)
+        time.sleep(REPORT_CHECK_INTERVAL)
+
+
+def start_scheduler():
+    """Start the digest scheduler thread in at most one process.
+
+    Whichever worker grabs the lock file runs it; the others skip.
+    """
+    global _scheduler_lock
+    lock = open(DB_PATH + ".reports.lock", "w")
+    if fcntl:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return None
+    _scheduler_lock = lock
+    thread = threading.Thread(target=_scheduler_loop, name="report-scheduler", daemon=True)
+    thread.start()
+    return thread
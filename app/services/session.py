@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, Request, Form, File, UploadFile
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
 from app import crud, models, database
-from app.services import xp
+from app.services import xp, streaks, courses
 from fastapi.templating import Jinja2Templates
 import os
+from datetime import date, datetime
 
 router = APIRouter(prefix="/session", tags=["session"])
 
@@ -94,10 +95,19 @@ def finish_session(
 
         log.notes_file = file_path
 
+    # Mark the day on the activity calendar and course progress (once per log)
+    if log.status != models.Status.completed:
+        streaks.record_activity(db, log.user_id, log.date or date.today(), log.time_allocated)
+        streaks.sync_streaks(db, crud.get_user(db, log.user_id))
+        if completion_percent >= courses.CHAPTER_DONE_PERCENT:
+            courses.record_chapter_completion(db, log.user_id, log.resource_id)
+
     # Update other fields
     log.completion_percent = completion_percent
     log.outcome = outcome
     log.status = models.Status.completed
+    if log.end_time is None:
+        log.end_time = datetime.now()  # feeds the actual_minutes column
 
     db.commit()
     return RedirectResponse("/dashboard", status_code=303)
@@ -0,0 +1,178 @@
+from array import array
+from datetime import date, timedelta
+from sqlalchemy.orm import Session
+from app import crud, models
+
+# One bit per day of year in ActivityCalendar.days, one uint16 per day in
+# ActivityCalendar.minutes. Day 0 is January 1st.
+DAYS_PER_YEAR = 366
+BITMAP_BYTES = (DAYS_PER_YEAR + 7) // 8
+
+# Heatmap intensity thresholds (minutes) for levels 1..4
+LEVELS = (1, 30, 60, 120)
+
+
+def _day_index(day: date) -> int:
+    return day.timetuple().tm_yday - 1
+
+
+def _empty_calendar(user_id: int, year: int) -> models.ActivityCalendar:
+    return models.ActivityCalendar(
+        user_id=user_id,
+        year=year,
+        days=bytes(BITMAP_BYTES),
+        minutes=array("H", [0] * DAYS_PER_YEAR).tobytes(),
+    )
+
+
+def _get_calendar(db: Session, user_id: int, year: int) -> models.ActivityCalendar:
+    cal = (
+        db.query(models.ActivityCalendar)
+        .filter(models.ActivityCalendar.user_id == user_id, models.ActivityCalendar.year == year)
+        .first()
+    )
+    if not cal:
+        cal = _empty_calendar(user_id, year)
+        db.add(cal)
+    return cal
+
+
+def _add_day(cal: models.ActivityCalendar, day: date, minutes: int):
+    i = _day_index(day)
+    bits = int.from_bytes(cal.days, "little") | (1 << i)
+    cal.days = bits.to_bytes(BITMAP_BYTES, "little")
+    packed = array("H", cal.minutes)
+    packed[i] = min(packed[i] + max(minutes, 0), 0xFFFF)
+    cal.minutes = packed.tobytes()
+
+
+def record_activity(db: Session, user_id: int, day: date, minutes: int):
+    """Mark a day active for the user and add its minutes (no commit).
+
+    Flushes so streak queries in the same session see the new bitmap
+    (sessions don't autoflush).
+    """
+    _add_day(_get_calendar(db, user_id, day.year), day, minutes or 0)
+    db.flush()
+
+
+def sync_streaks(db: Session, user: models.User):
+    """Set the user's stored streak counters from the bitmaps (no commit)."""
+    user.current_streak, user.longest_streak = streaks(db, user.id)
+
+
+def rebuild_calendar(db: Session, user_id: int):
+    """Recompute a user's calendars from their completed logs (no commit)."""
+    db.query(models.ActivityCalendar).filter(models.ActivityCalendar.user_id == user_id).delete()
+    log = crud.all_logs()
+    rows = (
+        db.query(log.date, log.time_allocated)
+        .filter(log.user_id == user_id, log.status == models.Status.completed, log.date.isnot(None))
+        .all()
+    )
+    calendars = {}
+    for day, minutes in rows:
+        if day.year not in calendars:
+            calendars[day.year] = _empty_calendar(user_id, day.year)
+        _add_day(calendars[day.year], day, minutes or 0)
+    db.add_all(calendars.values())
+    db.flush()
+
+
+def _user_bits(db: Session, user_id: int):
+    """All of a user's years joined into one integer; bit 0 is Jan 1st of the first year."""
+    calendars = (
+        db.query(models.ActivityCalendar)
+        .filter(models.ActivityCalendar.user_id == user_id)
+        .order_by(models.ActivityCalendar.year)
+        .all()
+    )
+    if not calendars:
+        return 0, None
+    start = date(calendars[0].year, 1, 1)
+    bits = 0
+    for cal in calendars:
+        offset = (date(cal.year, 1, 1) - start).days
+        bits |= int.from_bytes(cal.days, "little") << offset
+    return bits, start
+
+
+def longest_run(bits: int) -> int:
+    """Length of the longest run of set bits, in O(log n) big-int operations."""
+    if not bits:
+        return 0
+    # runs[k] has bit i set iff bits i .. i + 2**k - 1 are all set
+    runs = [bits]
+    length = 1
+    while True:
+        nxt = runs[-1] & (runs[-1] >> length)
+        if not nxt:
+            break
+        runs.append(nxt)
+        length *= 2
+    # Extend greedily with smaller powers of two
+    current = runs[-1]
+    for k in reversed(range(len(runs) - 1)):
+        candidate = current & (runs[k] >> length)
+        if candidate:
+            current = candidate
+            length += 1 << k
+    return length
+
+
+def run_ending_at(bits: int, end: int) -> int:
+    """Length of the run of set bits ending at bit `end` (inclusive)."""
+    if end < 0 or not (bits >> end) & 1:
+        return 0
+    mask = (1 << (end + 1)) - 1
+    gaps = ~bits & mask
+    return end + 1 if not gaps else end - gaps.bit_length() + 1
+
+
+def streaks(db: Session, user_id: int, today: date = None) -> tuple[int, int]:
+    """Current and longest streak in days, derived from the calendar bitmaps.
+
+    The current streak stays alive until a full day is missed, so a streak
+    ending yesterday still counts.
+    """
+    today = today or date.today()
+    bits, start = _user_bits(db, user_id)
+    if not bits:
+        return 0, 0
+    t = (today - start).days
+    current = run_ending_at(bits, t) or run_ending_at(bits, t - 1)
+    return current, longest_run(bits)
+
+
+def _level(minutes: int) -> int:
+    return sum(1 for threshold in LEVELS if minutes >= threshold)
+
+
+def heatmap(db: Session, user_id: int, year: int) -> list[list[dict]]:
+    """GitHub-style grid: a list of weeks (Monday first), each with 7 cells.
+
+    Cells outside the year are None.
+    """
+    cal = (
+        db.query(models.ActivityCalendar)
+        .filter(models.ActivityCalendar.user_id == user_id, models.ActivityCalendar.year == year)
+        .first()
+    )
+    packed = array("H", cal.minutes) if cal else array("H", [0] * DAYS_PER_YEAR)
+
+    first = date(year, 1, 1)
+    ndays = (date(year, 12, 31) - first).days + 1
+    # Cell k of the grid is day (k - lead) of the year; stays inside date's range
+    lead = first.weekday()
+    weeks = []
+    for w in range((lead + ndays + 6) // 7):
+        week = []
+        for k in range(w * 7, w * 7 + 7):
+            d = k - lead
+            if 0 <= d < ndays:
+                minutes = packed[d]
+                week.append({"date": str(first + timedelta(days=d)), "minutes": minutes, "level": _level(minutes)})
+            else:
+                week.append(None)
+        weeks.append(week)
+    return weeks
@@ -0,0 +1,14 @@
+import sys
+from app.database import SessionLocal, Base, engine
+from app.config import ARCHIVE_AFTER_DAYS
+from app.services.archive import archive_logs
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else ARCHIVE_AFTER_DAYS
+    Base.metadata.create_all(bind=engine)  # ensure archive tables exist
+    db = SessionLocal()
+    print(f"🧊 Archiving completed logs older than {days} days...")
+    moved = archive_logs(db, days)
+    print(f"✅ Archived {moved} logs")
+
+    db.close()
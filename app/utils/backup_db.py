@@ -0,0 +1,27 @@
+import sys
+from app.services import backup
+
+USAGE = "usage: python -m app.utils.backup_db backup | restore <snapshot file or timestamp>"
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "backup":
+        handle = backup.acquire_backup_lock()
+        if handle is None:
+            sys.exit("❌ Backup already running")
+        try:
+            print("💾 Backing up databases...")
+            created = backup.create_snapshot()
+        finally:
+            backup.release_backup_lock(handle)
+        for path in created:
+            print(f"✅ {path}")
+    elif len(sys.argv) == 3 and sys.argv[1] == "restore":
+        print(f"♻️ Restoring {sys.argv[2]}...")
+        try:
+            restored = backup.restore_snapshot(sys.argv[2])
+        except ValueError as e:
+            sys.exit(f"❌ {e}")
+        for path in restored:
+            print(f"✅ Restored {path}")
+    else:
+        sys.exit(USAGE)
@@ -0,0 +1,70 @@
+from sqlalchemy.orm import aliased
+from app.database import SessionLocal, init_db
+from app import models
+from app.services import courses
+
+# Resources created on the fly from the Start Session form
+AD_HOC = "Ad-hoc"
+
+
+def adopt_built_courses(db):
+    """Fill `course` from an existing tree on databases that predate the column.
+
+    Only runs while no resource has a course yet, so clearing one later
+    still takes it out of its course.
+    """
+    if db.query(models.Resource.id).filter(models.Resource.course.isnot(None)).first():
+        return
+    root = aliased(models.CourseNode)
+    rows = (
+        db.query(models.Resource, root.name)
+        .join(models.CourseNode, models.CourseNode.resource_id == models.Resource.id)
+        .join(root, root.id == models.CourseNode.course_id)
+        .filter(models.Resource.details.is_distinct_from(AD_HOC))
+        .all()
+    )
+    for resource, course in rows:
+        resource.course = course
+    db.commit()
+
+
+def course_resources(db) -> dict[str, list[models.Resource]]:
+    """Resources grouped by their `course` column; ad-hoc ones are left out."""
+    resources = (
+        db.query(models.Resource)
+        .filter(models.Resource.course.isnot(None),
+                models.Resource.details.is_distinct_from(AD_HOC))
+        .all()
+    )
+    grouped = {}
+    for r in resources:
+        grouped.setdefault(r.course, []).append(r)
+    return grouped
+
+
+def drop_stale_courses(db, keep: set[str]):
+    stale = (
+        db.query(models.CourseNode)
+        .filter(models.CourseNode.kind == models.NodeKind.course, models.CourseNode.name.notin_(keep))
+        .all()
+    )
+    for course in stale:
+        courses.remove_course(db, course)
+        print(f"  removed {course.name}")
+    db.commit()
+
+
+if __name__ == "__main__":
+    init_db()  # ensure tables and newer columns exist
+    db = SessionLocal()
+    adopt_built_courses(db)
+    grouped = course_resources(db)
+    print("📚 Building courses from resources...")
+    drop_stale_courses(db, set(grouped))
+    for name, resources in grouped.items():
+        course = courses.build_course(db, name, resources)
+        print(f"  {course.name}: {course.chapter_count} chapters")
+    courses.backfill_progress(db)
+    print("✅ Courses built and progress backfilled")
+
+    db.close()
@@ -0,0 +1,18 @@
+from app.database import SessionLocal, Base, engine
+from app import models
+from app.services import streaks
+
+# One-time backfill: activity calendars (and the stored streak counters)
+# for logs completed before calendars existed
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)  # ensure tables exist
+    db = SessionLocal()
+    print("📅 Rebuilding activity calendars from logs...")
+    for user in db.query(models.User).all():
+        streaks.rebuild_calendar(db, user.id)
+        streaks.sync_streaks(db, user)
+        print(f"  {user.name}: streak {user.current_streak}, best {user.longest_streak}")
+    db.commit()
+    print("✅ Calendars rebuilt")
+
+    db.close()
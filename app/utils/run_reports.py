@@ -0,0 +1,18 @@
+import sys
+from app.services import reports
+
+USAGE = "usage: python -m app.utils.run_reports weekly|monthly [--force]"
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in reports.PERIODS:
+        sys.exit(USAGE)
+    period = sys.argv[1]
+    handle = reports.acquire_run_lock()
+    if handle is None:
+        sys.exit("❌ Report generation already running")
+    try:
+        print(f"🗞️ Generating {period} digests...")
+        written = reports.run_reports(period, force="--force" in sys.argv)
+    finally:
+        reports.release_run_lock(handle)
+    print(f"✅ {len(written)} reports written")
@@ -9,6 +9,12 @@ def reset_tables(db):
     db.query(models.User).delete()
     db.query(models.Resource).delete()
     db.query(models.ActivityLog).delete()
+    db.query(models.ArchivedActivityLog).delete()
+    db.query(models.LogRollup).delete()
+    db.query(models.SessionLengthRollup).delete()
+    db.query(models.ActivityCalendar).delete()
+    db.query(models.CourseProgress).delete()
+    db.query(models.CourseNode).delete()
     db.commit()
 
 
@@ -31,6 +37,7 @@ def seed_resources(db: Session, filepath: str):
                 chapter_number=int(row["chapter_number"]) if row["chapter_number"] else None,
                 duration=int(row["duration"]) if row["duration"] else None,
                 details=row["details"],
+                course=row.get("course") or None,
             )
             db.add(resource)
     db.commit()
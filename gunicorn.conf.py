@@ -0,0 +1,20 @@
+import multiprocessing
+import os
+
+# Multi-worker deployment: gunicorn master + uvicorn workers
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def on_starting(server):
+    # Runs once in the master before any worker is forked
+    from app.main import app  # noqa: F401  (registers all models)
+    from app.database import init_db
+    init_db()
+
+
+def post_fork(server, worker):
+    # Don't reuse SQLite connections opened in the master
+    from app.database import engine
+    engine.dispose(close=False)
@@ -1,4 +1,10 @@
 #!/bin/bash
 
-# Run the FastAPI app with auto-reload
-uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
+# Run the FastAPI app
+#   ./run.sh              single process with auto-reload (dev)
+#   WORKERS=4 ./run.sh    gunicorn with 4 uvicorn workers
+if [ "${WORKERS:-1}" -gt 1 ]; then
+    gunicorn app.main:app -c gunicorn.conf.py
+else
+    uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
+fi